@@ -21,13 +21,13 @@
 # SOFTWARE.
 
 
-from scipy.signal import spectrogram, detrend
-from scipy.linalg import norm
-import matplotlib.pyplot as plt
+from scipy.signal import detrend
+from scipy.fft import fft, irfft, rfft, rfftfreq
 import numpy as np
+import copy
 import pickle
-from obspy.core import Stream, Trace, read
-from obstools.atacr import utils, plot
+from obspy.core import Trace, read
+from obstools.atacr import utils
 
 
 class Power(object):
@@ -249,11 +249,25 @@ class DayNoise(object):
         self.year = self.trZ.stats.starttime.year
         self.julday = self.trZ.stats.starttime.julday
 
-        # Get number of components for the available, non-empty traces
-        ncomp = np.sum(1 for tr in
-                       Stream(traces=[tr1, tr2, trZ, trP]) if np.any(tr.data))
+        # Get number of components for the available, non-empty traces.
+        # Missing components are passed as empty placeholder traces with
+        # zero npts, so there is no need to scan the day-long arrays
+        ncomp = sum(tr.stats.npts > 0 for tr in [tr1, tr2, trZ, trP])
         self.ncomp = ncomp
 
+        # Pack the day-long traces into one contiguous float32 block and
+        # point each available trace at its row. Single precision halves
+        # the memory traffic of the FFT/log/smoothing passes downstream
+        # (the spectra come out as complex64) and its round-off is far
+        # below the QC thresholds
+        buf = np.empty((ncomp, self.npts), dtype=np.float32)
+        row = 0
+        for tr in [tr1, tr2, trZ, trP]:
+            if tr.stats.npts > 0:
+                buf[row, :] = tr.data
+                tr.data = buf[row]
+                row += 1
+
         # Build list of available transfer functions based on the number of
         # components
         if self.ncomp == 2:
@@ -268,9 +282,32 @@ class DayNoise(object):
 
         self.QC = False
         self.av = False
+        self._wind_cache = {}
+
+    def _taper_window(self, ws, ss):
+        """
+        Returns the Hann-tapered window for the given window and overlap
+        lengths (in samples), cached on the instance so repeated calls
+        do not rebuild the taper
+
+        """
+
+        try:
+            return self._wind_cache[(ws, ss)]
+        except KeyError:
+            pass
+
+        hanning = np.hanning(2*ss)
+        wind = np.ones(ws, dtype=np.float32)
+        wind[0:ss] = hanning[0:ss]
+        wind[-ss:ws] = hanning[ss:ws]
+        self._wind_cache[(ws, ss)] = wind
+
+        return wind
 
     def QC_daily_spectra(self, pd=[0.004, 0.2], tol=1.5, alpha=0.05,
-                         smooth=True, fig_QC=False, debug=False):
+                         smooth=True, legacy=True, fig_QC=False,
+                         debug=False):
         """
         Method to determine daily time windows for which the spectra are 
         anomalous and should be discarded in the calculation of the
@@ -287,8 +324,14 @@ class DayNoise(object):
             Confidence interval for f-test
         smooth : boolean
             Determines if the smoothed (True) or raw (False) spectra are used
+        legacy : boolean
+            If True (default), windows are purged iteratively with an
+            f-test between passes, as in the original implementation.
+            If False, all windows beyond the tolerance are killed in a
+            single thresholding pass with one refinement - much faster
+            on long continuous records and typically identical
         fig_QC : boolean
-            Whether or not to produce a figure showing the results of the 
+            Whether or not to produce a figure showing the results of the
             quality control
         debug : boolean
             Whether or not to plot intermediate steps in the QC procedure 
@@ -328,36 +371,63 @@ class DayNoise(object):
         # Number of points to overlap
         ss = int(self.window*self.overlap/self.dt)
 
-        # hanning window
-        hanning = np.hanning(2*ss)
-        wind = np.ones(ws)
-        wind[0:ss] = hanning[0:ss]
-        wind[-ss:ws] = hanning[ss:ws]
+        # hanning window (float32 to preserve the single-precision
+        # pipeline through the tapering step), cached on the instance
+        wind = self._taper_window(ws, ss)
 
-        # Get spectrograms for single day-long keys
-        psd1 = None
-        psd2 = None
-        psdZ = None
-        psdP = None
-        f, t, psdZ = spectrogram(
-            self.trZ.data, self.fs, window=wind, nperseg=ws, noverlap=ss)
+        # Get spectrograms for single day-long keys. All available
+        # components are stacked into a single array so that the windowing
+        # and the (real) FFT are only carried out once
+        psd1 = psd2 = psdZ = psdP = None
+        comps = [self.trZ.data]
         if self.ncomp == 2 or self.ncomp == 4:
-            f, t, psdP = spectrogram(
-                self.trP.data, self.fs, window=wind, nperseg=ws, noverlap=ss)
+            comps.append(self.trP.data)
         if self.ncomp == 3 or self.ncomp == 4:
-            f, t, psd1 = spectrogram(
-                self.tr1.data, self.fs, window=wind, nperseg=ws, noverlap=ss)
-            f, t, psd2 = spectrogram(
-                self.tr2.data, self.fs, window=wind, nperseg=ws, noverlap=ss)
+            comps.append(self.tr1.data)
+            comps.append(self.tr2.data)
+
+        step = ws - ss
+        segs = np.lib.stride_tricks.sliding_window_view(
+            np.stack(comps), ws, axis=-1)[:, ::step, :]
+        segs = (segs - np.mean(segs, axis=-1, keepdims=True))*wind
+        spec = rfft(segs, axis=-1, workers=-1)
+
+        # One-sided PSDs, consistent with scipy.signal.spectrogram
+        # (density scaling, all bins doubled except DC and Nyquist)
+        psds = (spec.real**2 + spec.imag**2)/(self.fs*np.sum(wind**2))
+        if ws % 2 == 0:
+            psds[..., 1:-1] *= 2.
+        else:
+            psds[..., 1:] *= 2.
+        psds = psds.transpose(0, 2, 1)
+
+        f = rfftfreq(ws, d=self.dt)
+        t = (np.arange(psds.shape[2])*step + ws/2.)/self.fs
+
+        # Everything below works on the log of the PSDs, so take it once,
+        # in place - the raw spectra are not needed beyond this point
+        np.log(psds, out=psds)
+
+        psdZ = psds[0]
+        if self.ncomp == 2:
+            psdP = psds[1]
+        elif self.ncomp == 3:
+            psd1 = psds[1]
+            psd2 = psds[2]
+        elif self.ncomp == 4:
+            psdP = psds[1]
+            psd1 = psds[2]
+            psd2 = psds[3]
 
         if fig_QC:
+            import matplotlib.pyplot as plt
             if self.ncomp == 2:
                 plt.figure(1)
                 plt.subplot(2, 1, 1)
-                plt.pcolormesh(t, f, np.log(psdZ))
+                plt.pcolormesh(t, f, psdZ)
                 plt.title('Z', fontdict={'fontsize': 8})
                 plt.subplot(2, 1, 2)
-                plt.pcolormesh(t, f, np.log(psdP))
+                plt.pcolormesh(t, f, psdP)
                 plt.title('P', fontdict={'fontsize': 8})
                 plt.xlabel('Seconds')
                 plt.tight_layout()
@@ -366,13 +436,13 @@ class DayNoise(object):
             elif self.ncomp == 3:
                 plt.figure(1)
                 plt.subplot(3, 1, 1)
-                plt.pcolormesh(t, f, np.log(psd1))
+                plt.pcolormesh(t, f, psd1)
                 plt.title('H1', fontdict={'fontsize': 8})
                 plt.subplot(3, 1, 2)
-                plt.pcolormesh(t, f, np.log(psd2))
+                plt.pcolormesh(t, f, psd2)
                 plt.title('H2', fontdict={'fontsize': 8})
                 plt.subplot(3, 1, 3)
-                plt.pcolormesh(t, f, np.log(psdZ))
+                plt.pcolormesh(t, f, psdZ)
                 plt.title('Z', fontdict={'fontsize': 8})
                 plt.xlabel('Seconds')
                 plt.tight_layout()
@@ -381,16 +451,16 @@ class DayNoise(object):
             else:
                 plt.figure(1)
                 plt.subplot(4, 1, 1)
-                plt.pcolormesh(t, f, np.log(psd1))
+                plt.pcolormesh(t, f, psd1)
                 plt.title('H1', fontdict={'fontsize': 8})
                 plt.subplot(4, 1, 2)
-                plt.pcolormesh(t, f, np.log(psd2))
+                plt.pcolormesh(t, f, psd2)
                 plt.title('H2', fontdict={'fontsize': 8})
                 plt.subplot(4, 1, 3)
-                plt.pcolormesh(t, f, np.log(psdZ))
+                plt.pcolormesh(t, f, psdZ)
                 plt.title('Z', fontdict={'fontsize': 8})
                 plt.subplot(4, 1, 4)
-                plt.pcolormesh(t, f, np.log(psdP))
+                plt.pcolormesh(t, f, psdP)
                 plt.title('P', fontdict={'fontsize': 8})
                 plt.xlabel('Seconds')
                 plt.tight_layout()
@@ -401,46 +471,49 @@ class DayNoise(object):
 
         if smooth:
             # Smooth out the log of the PSDs
-            sl_psd1 = None
-            sl_psd2 = None
-            sl_psdZ = None
-            sl_psdP = None
-            sl_psdZ = utils.smooth(np.log(psdZ), 50, axis=0)
+            sl_psd1 = sl_psd2 = sl_psdZ = sl_psdP = None
+            sl_psdZ = utils.smooth(psdZ, 50, axis=0)
             if self.ncomp == 2 or self.ncomp == 4:
-                sl_psdP = utils.smooth(np.log(psdP), 50, axis=0)
+                sl_psdP = utils.smooth(psdP, 50, axis=0)
             if self.ncomp == 3 or self.ncomp == 4:
-                sl_psd1 = utils.smooth(np.log(psd1), 50, axis=0)
-                sl_psd2 = utils.smooth(np.log(psd2), 50, axis=0)
+                sl_psd1 = utils.smooth(psd1, 50, axis=0)
+                sl_psd2 = utils.smooth(psd2, 50, axis=0)
 
         else:
             # Take the log of the PSDs
-            sl_psd1 = None
-            sl_psd2 = None
-            sl_psdZ = None
-            sl_psdP = None
-            sl_psdZ = np.log(psdZ)
+            sl_psd1 = sl_psd2 = sl_psdZ = sl_psdP = None
+            sl_psdZ = psdZ
             if self.ncomp == 2 or self.ncomp == 4:
-                sl_psdP = np.log(psdP)
+                sl_psdP = psdP
             if self.ncomp == 3 or self.ncomp == 4:
-                sl_psd1 = np.log(psd1)
-                sl_psd2 = np.log(psd2)
+                sl_psd1 = psd1
+                sl_psd2 = psd2
 
-        # Remove mean of the log PSDs
-        dsl_psdZ = sl_psdZ[ff, :] - np.mean(sl_psdZ[ff, :], axis=0)
+        # Remove mean of the log PSDs, slicing the band of interest only
+        # once per component
+        dsl_psdZ = sl_psdZ[ff, :]
+        dsl_psdZ -= np.mean(dsl_psdZ, axis=0)
         if self.ncomp == 2:
-            dsl_psdP = sl_psdP[ff, :] - np.mean(sl_psdP[ff, :], axis=0)
+            dsl_psdP = sl_psdP[ff, :]
+            dsl_psdP -= np.mean(dsl_psdP, axis=0)
             dsls = [dsl_psdZ, dsl_psdP]
         elif self.ncomp == 3:
-            dsl_psd1 = sl_psd1[ff, :] - np.mean(sl_psd1[ff, :], axis=0)
-            dsl_psd2 = sl_psd2[ff, :] - np.mean(sl_psd2[ff, :], axis=0)
+            dsl_psd1 = sl_psd1[ff, :]
+            dsl_psd1 -= np.mean(dsl_psd1, axis=0)
+            dsl_psd2 = sl_psd2[ff, :]
+            dsl_psd2 -= np.mean(dsl_psd2, axis=0)
             dsls = [dsl_psd1, dsl_psd2, dsl_psdZ]
         else:
-            dsl_psd1 = sl_psd1[ff, :] - np.mean(sl_psd1[ff, :], axis=0)
-            dsl_psd2 = sl_psd2[ff, :] - np.mean(sl_psd2[ff, :], axis=0)
-            dsl_psdP = sl_psdP[ff, :] - np.mean(sl_psdP[ff, :], axis=0)
+            dsl_psd1 = sl_psd1[ff, :]
+            dsl_psd1 -= np.mean(dsl_psd1, axis=0)
+            dsl_psd2 = sl_psd2[ff, :]
+            dsl_psd2 -= np.mean(dsl_psd2, axis=0)
+            dsl_psdP = sl_psdP[ff, :]
+            dsl_psdP -= np.mean(dsl_psdP, axis=0)
             dsls = [dsl_psd1, dsl_psd2, dsl_psdZ, dsl_psdP]
 
         if debug:
+            import matplotlib.pyplot as plt
             if self.ncomp == 2:
                 plt.figure(2)
                 plt.subplot(2, 1, 1)
@@ -472,63 +545,77 @@ class DayNoise(object):
                 plt.tight_layout()
                 plt.show()
 
-        # Cycle through to kill high-std-norm windows
-        moveon = False
-        goodwins = np.repeat([True], len(t))
-        indwin = np.argwhere(goodwins == True)
-
-        while moveon == False:
+        # Cycle through to kill high-std-norm windows. The retained
+        # windows are tracked with a single boolean mask
+        goodwins = np.ones(len(t), dtype=bool)
 
+        def _ubernorm():
+            # Vectorized leave-one-out std over good windows: derive
+            # the variance of all-but-one window from the running sums
+            # instead of re-slicing the array for each window
             ubernorm = np.empty((self.ncomp, np.sum(goodwins)))
             for ind_u, dsl in enumerate(dsls):
-                normvar = np.zeros(np.sum(goodwins))
-                for ii, tmp in enumerate(indwin):
-                    ind = np.copy(indwin)
-                    ind = np.delete(ind, ii)
-                    normvar[ii] = norm(np.std(dsl[:, ind], axis=1), ord=2)
+                d = dsl[:, goodwins]
+                nwin = d.shape[1]
+                S1 = np.sum(d, axis=1, keepdims=True)
+                S2 = np.sum(d*d, axis=1, keepdims=True)
+                loovar = (S2 - d*d)/(nwin - 1) - ((S1 - d)/(nwin - 1))**2
+                normvar = np.sqrt(np.sum(loovar, axis=0))
                 ubernorm[ind_u, :] = np.median(normvar) - normvar
-
-            penalty = np.sum(ubernorm, axis=0)
-
-            if debug:
-                plt.figure(4)
-                for i in range(self.ncomp):
-                    plt.plot(range(0, np.sum(goodwins)), detrend(
-                        ubernorm, type='constant')[i], 'o-')
-                plt.show()
-                plt.figure(5)
-                plt.plot(range(0, np.sum(goodwins)),
-                         np.sum(ubernorm, axis=0), 'o-')
-                plt.show()
-
-            kill = penalty > tol*np.std(penalty)
-            if np.sum(kill) == 0:
-                self.goodwins = goodwins
-                moveon = True
-                if fig_QC:
-                    power = Power(sl_psd1, sl_psd2, sl_psdZ, sl_psdP)
-                    plot.fig_QC(f, power, goodwins, self.ncomp, key=self.key)
-                return
-
-            trypenalty = penalty[np.argwhere(kill == False)].T[0]
-
-            if utils.ftest(penalty, 1, trypenalty, 1) < alpha:
-                goodwins[indwin[kill == True]] = False
-                indwin = np.argwhere(goodwins == True)
-                moveon = False
-            else:
-                moveon = True
+            return ubernorm
+
+        if legacy:
+            moveon = False
+            while moveon == False:
+
+                ubernorm = _ubernorm()
+                penalty = np.sum(ubernorm, axis=0)
+
+                if debug:
+                    import matplotlib.pyplot as plt
+                    plt.figure(4)
+                    for i in range(self.ncomp):
+                        plt.plot(range(0, np.sum(goodwins)), detrend(
+                            ubernorm, type='constant')[i], 'o-')
+                    plt.show()
+                    plt.figure(5)
+                    plt.plot(range(0, np.sum(goodwins)),
+                             np.sum(ubernorm, axis=0), 'o-')
+                    plt.show()
+
+                kill = penalty > tol*np.std(penalty)
+                if np.sum(kill) == 0:
+                    moveon = True
+                elif utils.ftest(penalty, 1, penalty[~kill], 1) < alpha:
+                    # Scatter the kill decision back onto the True
+                    # entries of the mask
+                    goodwins[goodwins] = ~kill
+                else:
+                    moveon = True
+        else:
+            # Direct thresholding with a bounded number of passes: kill
+            # every window beyond the tolerance in one go, refine once
+            # on the survivors and stop. Avoids the open-ended
+            # recompute-and-ftest cycle on long continuous records
+            for _ in range(2):
+                penalty = np.sum(_ubernorm(), axis=0)
+                kill = penalty > tol*np.std(penalty)
+                if np.sum(kill) == 0:
+                    break
+                goodwins[goodwins] = ~kill
 
         self.goodwins = goodwins
 
         if fig_QC:
+            from obstools.atacr import plot
             power = Power(sl_psd1, sl_psd2, sl_psdZ, sl_psdP)
             plot.fig_QC(f, power, goodwins, self.ncomp, key=self.key)
 
         self.QC = True
 
-    def average_daily_spectra(self, calc_rotation=True, fig_average=False,
-                              fig_coh_ph=False, debug=False):
+    def average_daily_spectra(self, calc_rotation=True, average='mean',
+                              fig_average=False, fig_coh_ph=False,
+                              debug=False):
         """
         Method to average the daily spectra for good windows. By default, the
         method will attempt to calculate the azimuth of maximum coherence 
@@ -540,6 +627,11 @@ class DayNoise(object):
         ----------
         calc_rotation : boolean
             Whether or not to calculate the tilt direction
+        average : str
+            Method for averaging the spectra over the good windows, one
+            of 'mean' or 'median'. The median is robust to bursty
+            transients that survive the QC step and is corrected for its
+            bias relative to the mean
         fig_average : boolean
             Whether or not to produce a figure showing the average daily 
             spectra
@@ -585,6 +677,10 @@ class DayNoise(object):
 
         """
 
+        if average not in ['mean', 'median']:
+            raise(Exception(
+                "Error: average must be one of 'mean' or 'median'"))
+
         if not self.QC:
             print("Warning: processing daynoise object for " +
                   "QC_daily_spectra using default values")
@@ -596,82 +692,105 @@ class DayNoise(object):
         # Number of points in step
         ss = int(self.window*(1.-self.overlap)/self.dt)
 
-        ft1 = None
-        ft2 = None
-        ftZ = None
-        ftP = None
-        ftZ, f = utils.calculate_windowed_fft(self.trZ, ws, ss)
-        if self.ncomp == 2 or self.ncomp == 4:
-            ftP, f = utils.calculate_windowed_fft(self.trP, ws, ss)
-        if self.ncomp == 3 or self.ncomp == 4:
-            ft1, f = utils.calculate_windowed_fft(self.tr1, ws, ss)
-            ft2, f = utils.calculate_windowed_fft(self.tr2, ws, ss)
+        # Frequency axis of the padded windowed FFTs (same convention as
+        # utils.calculate_windowed_fft)
+        n2 = utils.windowed_fft_len(ws)
+        f = self.fs/2. * np.linspace(0., 1., int(n2/2) + 1)
 
         self.f = f
 
-        # Extract good windows
-        c11 = None
-        c22 = None
-        cZZ = None
-        cPP = None
-        cZZ = np.abs(
-            np.mean(ftZ[self.goodwins, :]*np.conj(ftZ[self.goodwins, :]),
-                    axis=0))[0:len(f)]
+        # Available components, each a row of the packed data block
+        comps = ['Z']
+        trs = [self.trZ]
+        if self.ncomp == 2 or self.ncomp == 4:
+            comps.append('P')
+            trs.append(self.trP)
+        if self.ncomp == 3 or self.ncomp == 4:
+            comps.extend(['1', '2'])
+            trs.extend([self.tr1, self.tr2])
+        ic = {comp: i for i, comp in enumerate(comps)}
+        nc = len(comps)
+
+        # Tapered, overlapping windows as a zero-copy strided view -
+        # windows are only materialized per FFT batch below
+        hann = np.hanning(ws).astype(np.float32)
+        wins = np.lib.stride_tricks.sliding_window_view(
+            np.stack([tr.data for tr in trs]), ws,
+            axis=-1)[:, ::ss, :][:, 0:len(self.goodwins), :]
+
+        # Spectral matrix averaged over the good windows
+        Sb = None
+        if average == 'median':
+            # Median over windows, taken on the real and imaginary parts
+            # separately and corrected for the bias of the median of
+            # exponentially distributed periodogram estimates. The
+            # median needs all windows at once, so no chunking here
+            Fg = fft(wins[:, self.goodwins, :]*hann, n=n2, axis=-1,
+                     workers=-1)[:, :, 0:len(f)]
+            bias = utils.median_bias(np.sum(self.goodwins))
+            S = np.empty((nc, nc, len(f)), dtype=complex)
+            for cc in range(nc):
+                for dd in range(nc):
+                    prod = Fg[cc]*np.conj(Fg[dd])
+                    S[cc, dd] = (np.median(prod.real, axis=0) +
+                                 1j*np.median(prod.imag, axis=0))/bias
+            if np.sum(~self.goodwins) > 0:
+                Fb = fft(wins[:, ~self.goodwins, :]*hann, n=n2, axis=-1,
+                         workers=-1)[:, :, 0:len(f)]
+                Sb = np.einsum('cwf,cwf->cf', Fb, np.conj(Fb),
+                               optimize=True)/np.sum(~self.goodwins)
+        else:
+            # Accumulate the good- and bad-window spectral matrices in
+            # batches of windows (SEC-C-style chunking): only O(batch)
+            # windowed FFTs are ever held in memory, so day-long or much
+            # longer records stream at constant footprint
+            wg = self.goodwins.astype(float)
+            weights = np.stack([wg, 1. - wg])
+            S2 = np.zeros((2, nc, nc, len(f)), dtype=complex)
+            nwin = wins.shape[1]
+            batch = 64
+            for w0 in range(0, nwin, batch):
+                Fb = fft(wins[:, w0:w0+batch, :]*hann, n=n2, axis=-1,
+                         workers=-1)[:, :, 0:len(f)]
+                S2 += np.einsum('gw,cwf,dwf->gcdf',
+                                weights[:, w0:w0+batch], Fb, np.conj(Fb),
+                                optimize=True)
+            S = S2[0]/np.sum(self.goodwins)
+            if np.sum(~self.goodwins) > 0:
+                Sb = np.einsum('ccf->cf', S2[1])/np.sum(~self.goodwins)
+
+        # Extract good windows. The diagonal of the spectral matrix is
+        # real by construction, so take the real part directly instead
+        # of a complex modulus
+        c11 = c22 = cZZ = cPP = None
+        cZZ = np.real(S[ic['Z'], ic['Z']])
         if self.ncomp == 2 or self.ncomp == 4:
-            cPP = np.abs(
-                np.mean(ftP[self.goodwins, :]*np.conj(ftP[self.goodwins, :]),
-                        axis=0))[0:len(f)]
+            cPP = np.real(S[ic['P'], ic['P']])
         if self.ncomp == 3 or self.ncomp == 4:
-            c11 = np.abs(
-                np.mean(ft1[self.goodwins, :]*np.conj(ft1[self.goodwins, :]),
-                        axis=0))[0:len(f)]
-            c22 = np.abs(
-                np.mean(ft2[self.goodwins, :]*np.conj(ft2[self.goodwins, :]),
-                        axis=0))[0:len(f)]
-
-        # Extract bad windows
-        bc11 = None
-        bc22 = None
-        bcZZ = None
-        bcPP = None
-        if np.sum(~self.goodwins) > 0:
-            bcZZ = np.abs(np.mean(
-                ftZ[~self.goodwins, :]*np.conj(ftZ[~self.goodwins, :]),
-                axis=0))[0:len(f)]
+            c11 = np.real(S[ic['1'], ic['1']])
+            c22 = np.real(S[ic['2'], ic['2']])
+
+        # Extract bad windows (only the autos are needed, for plotting)
+        bc11 = bc22 = bcZZ = bcPP = None
+        if Sb is not None:
+            bcZZ = np.real(Sb[ic['Z']])
             if self.ncomp == 2 or self.ncomp == 4:
-                bcPP = np.abs(np.mean(
-                    ftP[~self.goodwins, :]*np.conj(ftP[~self.goodwins, :]),
-                    axis=0))[0:len(f)]
+                bcPP = np.real(Sb[ic['P']])
             if self.ncomp == 3 or self.ncomp == 4:
-                bc11 = np.abs(np.mean(
-                    ft1[~self.goodwins, :]*np.conj(ft1[~self.goodwins, :]),
-                    axis=0))[0:len(f)]
-                bc22 = np.abs(np.mean(
-                    ft2[~self.goodwins, :]*np.conj(ft2[~self.goodwins, :]),
-                    axis=0))[0:len(f)]
+                bc11 = np.real(Sb[ic['1']])
+                bc22 = np.real(Sb[ic['2']])
 
         # Calculate mean of all good windows if component combinations exist
-        c12 = None
-        c1Z = None
-        c2Z = None
-        c1P = None
-        c2P = None
-        cZP = None
+        c12 = c1Z = c2Z = c1P = c2P = cZP = None
         if self.ncomp == 3 or self.ncomp == 4:
-            c12 = np.mean(ft1[self.goodwins, :] *
-                          np.conj(ft2[self.goodwins, :]), axis=0)[0:len(f)]
-            c1Z = np.mean(ft1[self.goodwins, :] *
-                          np.conj(ftZ[self.goodwins, :]), axis=0)[0:len(f)]
-            c2Z = np.mean(ft2[self.goodwins, :] *
-                          np.conj(ftZ[self.goodwins, :]), axis=0)[0:len(f)]
+            c12 = S[ic['1'], ic['2']]
+            c1Z = S[ic['1'], ic['Z']]
+            c2Z = S[ic['2'], ic['Z']]
         if self.ncomp == 4:
-            c1P = np.mean(ft1[self.goodwins, :] *
-                          np.conj(ftP[self.goodwins, :]), axis=0)[0:len(f)]
-            c2P = np.mean(ft2[self.goodwins, :] *
-                          np.conj(ftP[self.goodwins, :]), axis=0)[0:len(f)]
+            c1P = S[ic['1'], ic['P']]
+            c2P = S[ic['2'], ic['P']]
         if self.ncomp == 2 or self.ncomp == 4:
-            cZP = np.mean(ftZ[self.goodwins, :] *
-                          np.conj(ftP[self.goodwins, :]), axis=0)[0:len(f)]
+            cZP = S[ic['Z'], ic['P']]
 
         # Store as attributes
         self.power = Power(c11, c22, cZZ, cPP)
@@ -679,17 +798,19 @@ class DayNoise(object):
         bad = Power(bc11, bc22, bcZZ, bcPP)
 
         if fig_average:
+            from obstools.atacr import plot
             plot.fig_average(f, self.power, bad, self.goodwins,
                              self.ncomp, key=self.key)
 
         if calc_rotation and self.ncomp >= 3:
             cHH, cHZ, cHP, coh, ph, direc, tilt, coh_value, phase_value = \
                 utils.calculate_tilt(
-                    ft1, ft2, ftZ, ftP, f, self.goodwins)
+                    c11, c22, cZZ, c12, c1Z, c2Z, c1P, c2P, f)
             self.rotation = Rotation(
                 cHH, cHZ, cHP, coh, ph, tilt, coh_value, phase_value, direc)
 
             if fig_coh_ph:
+                from obstools.atacr import plot
                 plot.fig_coh_ph(coh, ph, direc)
         else:
             self.rotation = Rotation()
@@ -732,16 +853,198 @@ class DayNoise(object):
             print("Warning: saving before having calculated the average " +
                   "spectra")
 
-        # Remove original traces to save disk space
-        del self.tr1
-        del self.tr2
-        del self.trZ
-        del self.trP
+        # Don't write the original traces - strip them from a shallow
+        # copy so the in-memory object stays usable after saving
+        out = copy.copy(self)
+        for attr in ['tr1', 'tr2', 'trZ', 'trP']:
+            out.__dict__.pop(attr, None)
 
         file = open(filename, 'wb')
-        pickle.dump(self, file)
+        pickle.dump(out, file, protocol=pickle.HIGHEST_PROTOCOL)
         file.close()
 
+    # Spectral containers and their array attributes, as written to disk
+    # by save_h5 and read back by load_h5
+    _h5_groups = {'power': ['c11', 'c22', 'cZZ', 'cPP'],
+                  'cross': ['c12', 'c1Z', 'c1P', 'c2Z', 'c2P', 'cZP'],
+                  'rotation': ['cHH', 'cHZ', 'cHP', 'coh', 'ph', 'direc']}
+    _h5_scalars = ['window', 'overlap', 'key', 'dt', 'npts', 'fs',
+                   'year', 'julday', 'ncomp', 'QC', 'av']
+
+    def save_h5(self, filename):
+        """
+        Method to save the processed spectra to an HDF5 file. Unlike
+        :func:`~obstools.atacr.classes.DayNoise.save`, the resulting
+        file is readable outside Python and individual spectra can be
+        read back selectively without loading the whole object; the
+        datasets are chunked and gzip-compressed on disk. Requires the
+        optional `h5py` package.
+
+        Parameters
+        ----------
+        filename : str
+            File name
+
+        """
+
+        try:
+            import h5py
+        except ImportError:
+            raise(Exception(
+                "Error: the h5py package is required for save_h5"))
+
+        if not self.av:
+            print("Warning: saving before having calculated the average " +
+                  "spectra")
+
+        with h5py.File(filename, 'w') as hf:
+            for attr in self._h5_scalars:
+                hf.attrs[attr] = getattr(self, attr)
+            for key, value in self.tf_list.items():
+                hf.attrs['tf_list_' + key] = value
+
+            hf.create_dataset('f', data=self.f, compression='gzip',
+                              compression_opts=4, chunks=True)
+            hf.create_dataset('goodwins', data=self.goodwins,
+                              compression='gzip', compression_opts=4,
+                              chunks=True)
+
+            for group, names in self._h5_groups.items():
+                grp = hf.create_group(group)
+                container = getattr(self, group)
+                for name in names:
+                    data = getattr(container, name)
+                    if data is not None:
+                        grp.create_dataset(name, data=data,
+                                           compression='gzip',
+                                           compression_opts=4, chunks=True)
+
+            for attr in ['tilt', 'coh_value', 'phase_value']:
+                value = getattr(self.rotation, attr)
+                if value is not None:
+                    hf['rotation'].attrs[attr] = value
+
+    @classmethod
+    def load_h5(cls, filename):
+        """
+        Method to load a processed object from an HDF5 file produced by
+        :func:`~obstools.atacr.classes.DayNoise.save_h5`. As with the
+        pickled form, the original traces are not part of the file.
+        Requires the optional `h5py` package.
+
+        Parameters
+        ----------
+        filename : str
+            File name
+
+        Returns
+        -------
+        daynoise : :class:`~obstools.atacr.classes.DayNoise`
+            DayNoise object without the original traces
+
+        """
+
+        try:
+            import h5py
+        except ImportError:
+            raise(Exception(
+                "Error: the h5py package is required for load_h5"))
+
+        daynoise = cls.__new__(cls)
+
+        with h5py.File(filename, 'r') as hf:
+            for attr in cls._h5_scalars:
+                setattr(daynoise, attr, hf.attrs[attr])
+            daynoise.tf_list = {
+                key[len('tf_list_'):]: bool(value)
+                for key, value in hf.attrs.items()
+                if key.startswith('tf_list_')}
+
+            daynoise.f = hf['f'][()]
+            daynoise.goodwins = hf['goodwins'][()]
+
+            for group, names in cls._h5_groups.items():
+                container = {name: hf[group][name][()]
+                             for name in names if name in hf[group]}
+                if group == 'power':
+                    daynoise.power = Power(**container)
+                elif group == 'cross':
+                    daynoise.cross = Cross(**container)
+                else:
+                    daynoise.rotation = Rotation(**container)
+
+            for attr in ['tilt', 'coh_value', 'phase_value']:
+                if attr in hf['rotation'].attrs:
+                    setattr(daynoise.rotation, attr,
+                            hf['rotation'].attrs[attr])
+
+        return daynoise
+
+
+def _process_day(daynoise):
+    """
+    Runs the QC and averaging methods of a single
+    :class:`~obstools.atacr.classes.DayNoise` object. Defined at module
+    level so that it can be pickled by :func:`process_days` workers.
+
+    """
+
+    if not daynoise.QC:
+        daynoise.QC_daily_spectra()
+    if not daynoise.av:
+        daynoise.average_daily_spectra()
+
+    return daynoise
+
+
+def process_days(daylist, n_jobs=-1):
+    """
+    Processes a list of :class:`~obstools.atacr.classes.DayNoise`
+    objects (quality control and averaging) in parallel across worker
+    processes. Days are independent of each other, so batch noise
+    analysis scales nearly linearly with the available cores.
+
+    Parameters
+    ----------
+    daylist : list
+        List of :class:`~obstools.atacr.classes.DayNoise` objects to
+        process
+    n_jobs : int
+        Number of worker processes. A negative value uses all available
+        cores; `n_jobs=1` processes the days sequentially in the
+        current process.
+
+    Returns
+    -------
+    daylist : list
+        List of processed :class:`~obstools.atacr.classes.DayNoise`
+        objects, in the same order as the input
+
+    Examples
+    --------
+
+    Process the demo days on all cores before stacking them into a
+    StaNoise object
+
+    >>> from obstools.atacr import StaNoise
+    >>> from obstools.atacr.classes import process_days
+    >>> stanoise = StaNoise('demo')
+    Uploading demo data - March 01 to 04, 2012, station 7D.M08A
+    >>> stanoise.daylist = process_days(stanoise.daylist)
+
+    """
+
+    if n_jobs == 1 or len(daylist) < 2:
+        return [_process_day(dn) for dn in daylist]
+
+    import multiprocessing as mp
+
+    if n_jobs < 0:
+        n_jobs = mp.cpu_count()
+
+    with mp.Pool(min(n_jobs, len(daylist))) as pool:
+        return pool.map(_process_day, daylist)
+
 
 class StaNoise(object):
     """
@@ -767,9 +1070,13 @@ class StaNoise(object):
         A list of :class:`~obstools.atacr.classes.DayNoise` objects to process
         and produce a station average
     initialized : bool
-        Whether or not the object has been initialized - `False` unless one 
-        of the methods have been called. When `True`, the `daylist` attribute 
+        Whether or not the object has been initialized - `False` unless one
+        of the methods have been called. When `True`, the `daylist` attribute
         is deleted from memory
+    single_precision : bool
+        Whether to unpack the daily spectra in single precision
+        (float32/complex64), which halves the memory traffic of the QC
+        and averaging steps. Default is `True`
 
     Examples
     --------
@@ -809,7 +1116,9 @@ class StaNoise(object):
 
     """
 
-    def __init__(self, daylist=None):
+    def __init__(self, daylist=None, single_precision=True):
+
+        self.single_precision = single_precision
 
         def _load_dn(day):
             import os
@@ -963,20 +1272,39 @@ class StaNoise(object):
             if not dn.av:
                 dn.average_daily_spectra()
 
+        # Dtype policy: the QC (log+smooth+norm) and weighted-averaging
+        # passes are bandwidth-bound and do not need double precision
+        if self.single_precision:
+            rdtype, cdtype = np.float32, np.complex64
+        else:
+            rdtype, cdtype = np.float64, np.complex128
+
+        def _stack(vals):
+            # Components that are missing on any day are None - return
+            # None for the whole station rather than an object array.
+            # Days are stacked as rows, (ndays, nfreq) C-order, so the
+            # QC day gathers and the frequency passes below walk
+            # contiguous memory
+            if any(v is None for v in vals):
+                return None
+            out = np.stack(vals)
+            return out.astype(
+                cdtype if np.iscomplexobj(out) else rdtype, copy=False)
+
         # Then unpack the DayNoise objects
-        self.c11 = np.array([dn.power.c11 for dn in self.daylist]).T
-        self.c22 = np.array([dn.power.c22 for dn in self.daylist]).T
-        self.cZZ = np.array([dn.power.cZZ for dn in self.daylist]).T
-        self.cPP = np.array([dn.power.cPP for dn in self.daylist]).T
-        self.c12 = np.array([dn.cross.c12 for dn in self.daylist]).T
-        self.c1Z = np.array([dn.cross.c1Z for dn in self.daylist]).T
-        self.c1P = np.array([dn.cross.c1P for dn in self.daylist]).T
-        self.c2Z = np.array([dn.cross.c2Z for dn in self.daylist]).T
-        self.c2P = np.array([dn.cross.c2P for dn in self.daylist]).T
-        self.cZP = np.array([dn.cross.cZP for dn in self.daylist]).T
-        self.cHH = np.array([dn.rotation.cHH for dn in self.daylist]).T
-        self.cHZ = np.array([dn.rotation.cHZ for dn in self.daylist]).T
-        self.cHP = np.array([dn.rotation.cHP for dn in self.daylist]).T
+        self.c11 = _stack([dn.power.c11 for dn in self.daylist])
+        self.c22 = _stack([dn.power.c22 for dn in self.daylist])
+        self.cZZ = _stack([dn.power.cZZ for dn in self.daylist])
+        self.cPP = _stack([dn.power.cPP for dn in self.daylist])
+        self.c12 = _stack([dn.cross.c12 for dn in self.daylist])
+        self.c1Z = _stack([dn.cross.c1Z for dn in self.daylist])
+        self.c1P = _stack([dn.cross.c1P for dn in self.daylist])
+        self.c2Z = _stack([dn.cross.c2Z for dn in self.daylist])
+        self.c2P = _stack([dn.cross.c2P for dn in self.daylist])
+        self.cZP = _stack([dn.cross.cZP for dn in self.daylist])
+        self.cHH = _stack([dn.rotation.cHH for dn in self.daylist])
+        self.cHZ = _stack([dn.rotation.cHZ for dn in self.daylist])
+        self.cHP = _stack([dn.rotation.cHP for dn in self.daylist])
         self.direc = self.daylist[0].rotation.direc
         self.tilt = self.daylist[0].rotation.tilt
         self.f = self.daylist[0].f
@@ -1052,85 +1380,105 @@ class StaNoise(object):
             self.init()
 
         # Select bandpass frequencies
-        ff = (self.f > pd[0]) & (self.f < pd[1])
-
-        # Smooth out the log of the PSDs
-        sl_cZZ = None
-        sl_c11 = None
-        sl_c22 = None
-        sl_cPP = None
-        sl_cZZ = utils.smooth(np.log(self.cZZ), 50, axis=0)
+        # Select bandpass frequencies. The mask only depends on the
+        # passband corners once the object is initialized, so cache it
+        if not hasattr(self, '_ff_cache'):
+            self._ff_cache = {}
+        ff = self._ff_cache.get((pd[0], pd[1]))
+        if ff is None:
+            ff = (self.f > pd[0]) & (self.f < pd[1])
+            self._ff_cache[(pd[0], pd[1])] = ff
+
+        # Smooth out the log of the PSDs. The stacked spectra are
+        # (ndays, nfreq) C-order, so the smoothing runs along the
+        # contiguous frequency axis
+        sl_cZZ = sl_c11 = sl_c22 = sl_cPP = None
+        sl_cZZ = utils.log_smooth(self.cZZ, 50, axis=1)
         if self.ncomp == 2 or self.ncomp == 4:
-            sl_cPP = utils.smooth(np.log(self.cPP), 50, axis=0)
+            sl_cPP = utils.log_smooth(self.cPP, 50, axis=1)
         if self.ncomp == 3 or self.ncomp == 4:
-            sl_c11 = utils.smooth(np.log(self.c11), 50, axis=0)
-            sl_c22 = utils.smooth(np.log(self.c22), 50, axis=0)
+            sl_c11 = utils.log_smooth(self.c11, 50, axis=1)
+            sl_c22 = utils.log_smooth(self.c22, 50, axis=1)
 
-        # Remove mean of the log PSDs
-        dsl_cZZ = sl_cZZ[ff, :] - np.mean(sl_cZZ[ff, :], axis=0)
+        # Remove mean of the log PSDs over the band of interest
+        dsl_cZZ = sl_cZZ[:, ff]
+        dsl_cZZ -= np.mean(dsl_cZZ, axis=1, keepdims=True)
         if self.ncomp == 2:
-            dsl_cPP = sl_cPP[ff, :] - np.mean(sl_cPP[ff, :], axis=0)
+            dsl_cPP = sl_cPP[:, ff]
+            dsl_cPP -= np.mean(dsl_cPP, axis=1, keepdims=True)
             dsls = [dsl_cZZ, dsl_cPP]
         elif self.ncomp == 3:
-            dsl_c11 = sl_c11[ff, :] - np.mean(sl_c11[ff, :], axis=0)
-            dsl_c22 = sl_c22[ff, :] - np.mean(sl_c22[ff, :], axis=0)
+            dsl_c11 = sl_c11[:, ff]
+            dsl_c11 -= np.mean(dsl_c11, axis=1, keepdims=True)
+            dsl_c22 = sl_c22[:, ff]
+            dsl_c22 -= np.mean(dsl_c22, axis=1, keepdims=True)
             dsls = [dsl_c11, dsl_c22, dsl_cZZ]
         else:
-            dsl_c11 = sl_c11[ff, :] - np.mean(sl_c11[ff, :], axis=0)
-            dsl_c22 = sl_c22[ff, :] - np.mean(sl_c22[ff, :], axis=0)
-            dsl_cPP = sl_cPP[ff, :] - np.mean(sl_cPP[ff, :], axis=0)
+            dsl_c11 = sl_c11[:, ff]
+            dsl_c11 -= np.mean(dsl_c11, axis=1, keepdims=True)
+            dsl_c22 = sl_c22[:, ff]
+            dsl_c22 -= np.mean(dsl_c22, axis=1, keepdims=True)
+            dsl_cPP = sl_cPP[:, ff]
+            dsl_cPP -= np.mean(dsl_cPP, axis=1, keepdims=True)
             dsls = [dsl_c11, dsl_c22, dsl_cZZ, dsl_cPP]
 
         if debug:
+            import matplotlib.pyplot as plt
             if self.ncomp == 2:
                 plt.figure(2)
                 plt.subplot(2, 1, 1)
-                plt.semilogx(self.f, sl_cZZ, 'g', lw=0.5)
+                plt.semilogx(self.f, sl_cZZ.T, 'g', lw=0.5)
                 plt.subplot(2, 1, 2)
-                plt.semilogx(self.f, sl_cPP, 'k', lw=0.5)
+                plt.semilogx(self.f, sl_cPP.T, 'k', lw=0.5)
                 plt.tight_layout()
                 plt.show()
             elif self.ncomp == 3:
                 plt.figure(2)
                 plt.subplot(3, 1, 1)
-                plt.semilogx(self.f, sl_c11, 'r', lw=0.5)
+                plt.semilogx(self.f, sl_c11.T, 'r', lw=0.5)
                 plt.subplot(3, 1, 2)
-                plt.semilogx(self.f, sl_c22, 'b', lw=0.5)
+                plt.semilogx(self.f, sl_c22.T, 'b', lw=0.5)
                 plt.subplot(3, 1, 3)
-                plt.semilogx(self.f, sl_cZZ, 'g', lw=0.5)
+                plt.semilogx(self.f, sl_cZZ.T, 'g', lw=0.5)
                 plt.tight_layout()
                 plt.show()
             else:
                 plt.figure(2)
                 plt.subplot(4, 1, 1)
-                plt.semilogx(self.f, sl_c11, 'r', lw=0.5)
+                plt.semilogx(self.f, sl_c11.T, 'r', lw=0.5)
                 plt.subplot(4, 1, 2)
-                plt.semilogx(self.f, sl_c22, 'b', lw=0.5)
+                plt.semilogx(self.f, sl_c22.T, 'b', lw=0.5)
                 plt.subplot(4, 1, 3)
-                plt.semilogx(self.f, sl_cZZ, 'g', lw=0.5)
+                plt.semilogx(self.f, sl_cZZ.T, 'g', lw=0.5)
                 plt.subplot(4, 1, 4)
-                plt.semilogx(self.f, sl_cPP, 'k', lw=0.5)
+                plt.semilogx(self.f, sl_cPP.T, 'k', lw=0.5)
                 plt.tight_layout()
                 plt.show()
 
-        # Cycle through to kill high-std-norm windows
+        # Cycle through to kill high-std-norm windows. Good days are
+        # tracked with a single boolean mask
         moveon = False
-        gooddays = np.repeat([True], self.cZZ.shape[1])
-        indwin = np.argwhere(gooddays == True)
+        gooddays = np.ones(self.cZZ.shape[0], dtype=bool)
 
         while moveon == False:
             ubernorm = np.empty((self.ncomp, np.sum(gooddays)))
             for ind_u, dsl in enumerate(dsls):
-                normvar = np.zeros(np.sum(gooddays))
-                for ii, tmp in enumerate(indwin):
-                    ind = np.copy(indwin)
-                    ind = np.delete(ind, ii)
-                    normvar[ii] = norm(np.std(dsl[:, ind], axis=1), ord=2)
+                # Leave-one-out std from running sums - one pass over
+                # the retained days rather than a fresh np.std on an
+                # np.delete copy per day. Gathering whole rows keeps
+                # the pass contiguous
+                d = dsl[gooddays]
+                nday = d.shape[0]
+                S1 = np.sum(d, axis=0, keepdims=True)
+                S2 = np.sum(d*d, axis=0, keepdims=True)
+                loovar = (S2 - d*d)/(nday - 1) - ((S1 - d)/(nday - 1))**2
+                normvar = np.sqrt(np.sum(loovar, axis=1))
                 ubernorm[ind_u, :] = np.median(normvar) - normvar
 
             penalty = np.sum(ubernorm, axis=0)
 
             if debug:
+                import matplotlib.pyplot as plt
                 plt.figure(4)
                 for i in range(self.ncomp):
                     plt.plot(range(0, np.sum(gooddays)), detrend(
@@ -1143,21 +1491,11 @@ class StaNoise(object):
 
             kill = penalty > tol*np.std(penalty)
             if np.sum(kill) == 0:
-                self.gooddays = gooddays
-                self.QC = True
                 moveon = True
-                if fig_QC:
-                    power = Power(sl_c11, sl_c22, sl_cZZ, sl_cPP)
-                    plot.fig_QC(self.f, power, gooddays,
-                                self.ncomp, key=self.key)
-                return
-
-            trypenalty = penalty[np.argwhere(kill == False)].T[0]
-
-            if utils.ftest(penalty, 1, trypenalty, 1) < alpha:
-                gooddays[indwin[kill == True]] = False
-                indwin = np.argwhere(gooddays == True)
-                moveon = False
+            elif utils.ftest(penalty, 1, penalty[~kill], 1) < alpha:
+                # Scatter the kill decision back onto the True entries
+                # of the mask
+                gooddays[gooddays] = ~kill
             else:
                 moveon = True
 
@@ -1165,7 +1503,13 @@ class StaNoise(object):
         self.QC = True
 
         if fig_QC:
-            power = Power(sl_c11, sl_c22, sl_cZZ, sl_cPP)
+            from obstools.atacr import plot
+
+            # The plotting functions expect the spectra as (nfreq,
+            # ndays) - hand them transposed views
+            def _t(sl):
+                return sl.T if sl is not None else None
+            power = Power(_t(sl_c11), _t(sl_c22), _t(sl_cZZ), _t(sl_cPP))
             plot.fig_QC(self.f, power, gooddays, self.ncomp, key=self.key)
 
     def average_sta_spectra(self, fig_average=False, debug=False):
@@ -1209,78 +1553,60 @@ class StaNoise(object):
                 "using default values")
             self.QC_sta_spectra()
 
-        # Power spectra
-        c11 = None
-        c22 = None
-        cZZ = None
-        cPP = None
-        cZZ = np.sum(self.cZZ[:, self.gooddays]*self.nwins[self.gooddays],
-                     axis=1)/np.sum(self.nwins[self.gooddays])
+        # Stack the available spectra so each weighted day-average is a
+        # single matrix-vector product rather than a per-component
+        # slice-multiply-sum. Power spectra (real) and cross spectra
+        # (complex) are stacked separately to preserve their dtypes
+        rspecs = {'cZZ': self.cZZ}
+        cspecs = {}
         if self.ncomp == 2 or self.ncomp == 4:
-            cPP = np.sum(self.cPP[:, self.gooddays]*self.nwins[self.gooddays],
-                         axis=1)/np.sum(self.nwins[self.gooddays])
+            rspecs['cPP'] = self.cPP
+            cspecs['cZP'] = self.cZP
         if self.ncomp == 3 or self.ncomp == 4:
-            c11 = np.sum(self.c11[:, self.gooddays]*self.nwins[self.gooddays],
-                         axis=1)/np.sum(self.nwins[self.gooddays])
-            c22 = np.sum(self.c22[:, self.gooddays]*self.nwins[self.gooddays],
-                         axis=1)/np.sum(self.nwins[self.gooddays])
+            rspecs.update({'c11': self.c11, 'c22': self.c22,
+                           'cHH': self.cHH})
+            cspecs.update({'c12': self.c12, 'c1Z': self.c1Z,
+                           'c2Z': self.c2Z, 'cHZ': self.cHZ})
+        if self.ncomp == 4:
+            cspecs.update({'c1P': self.c1P, 'c2P': self.c2P,
+                           'cHP': self.cHP})
+
+        rstack = np.stack(list(rspecs.values()))
+        cstack = np.stack(list(cspecs.values()))
+
+        # Power, cross and rotated spectra averaged over the good days:
+        # one vector-matrix product per dtype group across the (ndays,
+        # nfreq) stacks. The weight vector is cast to the stack dtypes
+        # so single-precision spectra are not upcast by the matmul
+        wg = self.nwins*self.gooddays
+        wgn = wg/np.sum(wg)
+        av = dict(zip(rspecs, wgn.astype(rstack.dtype) @ rstack))
+        av.update(zip(cspecs, wgn.astype(cstack.dtype) @ cstack))
+
+        c11 = av.get('c11')
+        c22 = av.get('c22')
+        cZZ = av['cZZ']
+        cPP = av.get('cPP')
+        c12 = av.get('c12')
+        c1Z = av.get('c1Z')
+        c2Z = av.get('c2Z')
+        c1P = av.get('c1P')
+        c2P = av.get('c2P')
+        cZP = av.get('cZP')
+        cHH = av.get('cHH')
+        cHZ = av.get('cHZ')
+        cHP = av.get('cHP')
 
         # Bad days - for plotting
-        bc11 = None
-        bc22 = None
-        bcZZ = None
-        bcPP = None
+        bc11 = bc22 = bcZZ = bcPP = None
         if np.sum(~self.gooddays) > 0:
-            bcZZ = np.sum(
-                self.cZZ[:, ~self.gooddays]*self.nwins[~self.gooddays],
-                axis=1)/np.sum(self.nwins[~self.gooddays])
-            if self.ncomp == 2 or self.ncomp == 4:
-                bcPP = np.sum(
-                    self.cPP[:, ~self.gooddays]*self.nwins[~self.gooddays],
-                    axis=1)/np.sum(self.nwins[~self.gooddays])
-            if self.ncomp == 3 or self.ncomp == 4:
-                bc11 = np.sum(
-                    self.c11[:, ~self.gooddays]*self.nwins[~self.gooddays],
-                    axis=1)/np.sum(self.nwins[~self.gooddays])
-                bc22 = np.sum(
-                    self.c22[:, ~self.gooddays]*self.nwins[~self.gooddays],
-                    axis=1)/np.sum(self.nwins[~self.gooddays])
-
-        # Cross spectra
-        c12 = None
-        c1Z = None
-        c2Z = None
-        c1P = None
-        c2P = None
-        cZP = None
-        if self.ncomp == 3 or self.ncomp == 4:
-            c12 = np.sum(self.c12[:, self.gooddays]*self.nwins[self.gooddays],
-                         axis=1)/np.sum(self.nwins[self.gooddays])
-            c1Z = np.sum(self.c1Z[:, self.gooddays]*self.nwins[self.gooddays],
-                         axis=1)/np.sum(self.nwins[self.gooddays])
-            c2Z = np.sum(self.c2Z[:, self.gooddays]*self.nwins[self.gooddays],
-                         axis=1)/np.sum(self.nwins[self.gooddays])
-        if self.ncomp == 4:
-            c1P = np.sum(self.c1P[:, self.gooddays]*self.nwins[self.gooddays],
-                         axis=1)/np.sum(self.nwins[self.gooddays])
-            c2P = np.sum(self.c2P[:, self.gooddays]*self.nwins[self.gooddays],
-                         axis=1)/np.sum(self.nwins[self.gooddays])
-        if self.ncomp == 2 or self.ncomp == 4:
-            cZP = np.sum(self.cZP[:, self.gooddays]*self.nwins[self.gooddays],
-                         axis=1)/np.sum(self.nwins[self.gooddays])
-
-        # Rotated component
-        cHH = None
-        cHZ = None
-        cHP = None
-        if self.ncomp == 3 or self.ncomp == 4:
-            cHH = np.sum(self.cHH[:, self.gooddays]*self.nwins[self.gooddays],
-                         axis=1)/np.sum(self.nwins[self.gooddays])
-            cHZ = np.sum(self.cHZ[:, self.gooddays]*self.nwins[self.gooddays],
-                         axis=1)/np.sum(self.nwins[self.gooddays])
-        if self.ncomp == 4:
-            cHP = np.sum(self.cHP[:, self.gooddays]*self.nwins[self.gooddays],
-                         axis=1)/np.sum(self.nwins[self.gooddays])
+            wb = self.nwins*~self.gooddays
+            bav = dict(zip(
+                rspecs, (wb/np.sum(wb)).astype(rstack.dtype) @ rstack))
+            bc11 = bav.get('c11')
+            bc22 = bav.get('c22')
+            bcZZ = bav['cZZ']
+            bcPP = bav.get('cPP')
 
         self.power = Power(c11, c22, cZZ, cPP)
         self.cross = Cross(c12, c1Z, c1P, c2Z, c2P, cZP)
@@ -1288,6 +1614,7 @@ class StaNoise(object):
         bad = Power(bc11, bc22, bcZZ, bcPP)
 
         if fig_average:
+            from obstools.atacr import plot
             plot.fig_average(self.f, self.power, bad,
                              self.gooddays, self.ncomp, key=self.key)
 
@@ -1329,23 +1656,71 @@ class StaNoise(object):
             print("Warning: saving before having calculated the average " +
                   "spectra")
 
-        # Remove traces to save disk space
-        del self.c11
-        del self.c22
-        del self.cZZ
-        del self.cPP
-        del self.c12
-        del self.c1Z
-        del self.c1P
-        del self.c2Z
-        del self.c2P
-        del self.cZP
+        # Don't write the stacked spectra - strip them from a shallow
+        # copy so the in-memory object stays usable after saving
+        out = copy.copy(self)
+        for attr in ['c11', 'c22', 'cZZ', 'cPP', 'c12',
+                     'c1Z', 'c1P', 'c2Z', 'c2P', 'cZP']:
+            out.__dict__.pop(attr, None)
 
         file = open(filename, 'wb')
-        pickle.dump(self, file)
+        pickle.dump(out, file, protocol=pickle.HIGHEST_PROTOCOL)
         file.close()
 
 
+def _process_station(stanoise):
+    """
+    Runs the QC and averaging methods of a single
+    :class:`~obstools.atacr.classes.StaNoise` object. Defined at module
+    level so that it can be pickled by :func:`process_stations` workers.
+
+    """
+
+    if not stanoise.initialized:
+        stanoise.QC_sta_spectra()
+    if not stanoise.av:
+        stanoise.average_sta_spectra()
+
+    return stanoise
+
+
+def process_stations(stalist, n_jobs=-1):
+    """
+    Processes a list of :class:`~obstools.atacr.classes.StaNoise`
+    objects (quality control and averaging) in parallel across worker
+    processes. Stations are independent of each other, so network-wide
+    noise analysis scales nearly linearly with the available cores.
+
+    Parameters
+    ----------
+    stalist : list
+        List of :class:`~obstools.atacr.classes.StaNoise` objects to
+        process
+    n_jobs : int
+        Number of worker processes. A negative value uses all available
+        cores; `n_jobs=1` processes the stations sequentially in the
+        current process.
+
+    Returns
+    -------
+    stalist : list
+        List of processed :class:`~obstools.atacr.classes.StaNoise`
+        objects, in the same order as the input
+
+    """
+
+    if n_jobs == 1 or len(stalist) < 2:
+        return [_process_station(sn) for sn in stalist]
+
+    import multiprocessing as mp
+
+    if n_jobs < 0:
+        n_jobs = mp.cpu_count()
+
+    with mp.Pool(min(n_jobs, len(stalist))) as pool:
+        return pool.map(_process_station, stalist)
+
+
 class TFNoise(object):
     """
     A TFNoise object contains attributes that store the transfer function 
@@ -1505,41 +1880,61 @@ class TFNoise(object):
 
             elif key == 'Z2-1':
                 if value:
-                    lc1c2 = np.conj(self.c12)/self.c11
-                    coh_12 = utils.coherence(self.c12, self.c11, self.c22)
-                    gc2c2_c1 = self.c22*(1. - coh_12)
-                    gc2cZ_c1 = np.conj(self.c2Z) - np.conj(lc1c2*self.c1Z)
-                    lc2cZ_c1 = gc2cZ_c1/gc2c2_c1
+                    if utils._tf_z2_1 is not None:
+                        # Fused numba kernel - single pass, no complex
+                        # temporaries
+                        lc1c2, lc2cZ_c1 = utils._tf_z2_1(
+                            self.c11, self.c22, self.c12,
+                            self.c1Z, self.c2Z)
+                    else:
+                        lc1c2 = np.conj(self.c12)/self.c11
+                        coh_12 = utils.coherence(
+                            self.c12, self.c11, self.c22)
+                        gc2c2_c1 = self.c22*(1. - coh_12)
+                        gc2cZ_c1 = np.conj(self.c2Z) - \
+                            np.conj(lc1c2*self.c1Z)
+                        lc2cZ_c1 = gc2cZ_c1/gc2c2_c1
                     tf_Z2_1 = {'TF_21': lc1c2, 'TF_Z2-1': lc2cZ_c1}
                     transfunc.add('Z2-1', tf_Z2_1)
 
             elif key == 'ZP-21':
                 if value:
-                    lc1cZ = np.conj(self.c1Z)/self.c11
-                    lc1c2 = np.conj(self.c12)/self.c11
-                    lc1cP = np.conj(self.c1P)/self.c11
+                    if utils._tf_zp_21 is not None:
+                        lc1cZ, lc1c2, lc1cP, lc2cP_c1, lc2cZ_c1, \
+                            lcPcZ_c2c1 = utils._tf_zp_21(
+                                self.c11, self.c22, self.cPP, self.c12,
+                                self.c1Z, self.c1P, self.c2Z, self.c2P,
+                                self.cZP)
+                    else:
+                        lc1cZ = np.conj(self.c1Z)/self.c11
+                        lc1c2 = np.conj(self.c12)/self.c11
+                        lc1cP = np.conj(self.c1P)/self.c11
 
-                    coh_12 = utils.coherence(self.c12, self.c11, self.c22)
-                    coh_1P = utils.coherence(self.c1P, self.c11, self.cPP)
+                        # Both coherences in one batched pass
+                        coh_12, coh_1P = utils.coherence(
+                            np.stack((self.c12, self.c1P)), self.c11,
+                            np.stack((self.c22, self.cPP)))
 
-                    gc2c2_c1 = self.c22*(1. - coh_12)
-                    gcPcP_c1 = self.cPP*(1. - coh_1P)
+                        gc2c2_c1 = self.c22*(1. - coh_12)
+                        gcPcP_c1 = self.cPP*(1. - coh_1P)
 
-                    gc2cZ_c1 = np.conj(self.c2Z) - np.conj(lc1c2*self.c1Z)
-                    gcPcZ_c1 = self.cZP - np.conj(lc1cP*self.c1Z)
+                        gc2cZ_c1 = np.conj(self.c2Z) - \
+                            np.conj(lc1c2*self.c1Z)
+                        gcPcZ_c1 = self.cZP - np.conj(lc1cP*self.c1Z)
 
-                    gc2cP_c1 = np.conj(self.c2P) - np.conj(lc1c2*self.c1P)
+                        gc2cP_c1 = np.conj(self.c2P) - \
+                            np.conj(lc1c2*self.c1P)
 
-                    lc2cP_c1 = gc2cP_c1/gc2c2_c1
-                    lc2cZ_c1 = gc2cZ_c1/gc2c2_c1
+                        lc2cP_c1 = gc2cP_c1/gc2c2_c1
+                        lc2cZ_c1 = gc2cZ_c1/gc2c2_c1
 
-                    coh_c2cP_c1 = utils.coherence(gc2cP_c1, gc2c2_c1,
-                                                  gcPcP_c1)
+                        coh_c2cP_c1 = utils.coherence(gc2cP_c1, gc2c2_c1,
+                                                      gcPcP_c1)
 
-                    gcPcP_c1c2 = gcPcP_c1*(1. - coh_c2cP_c1)
-                    gcPcZ_c1c2 = gcPcZ_c1 - np.conj(lc2cP_c1)*gc2cZ_c1
+                        gcPcP_c1c2 = gcPcP_c1*(1. - coh_c2cP_c1)
+                        gcPcZ_c1c2 = gcPcZ_c1 - np.conj(lc2cP_c1)*gc2cZ_c1
 
-                    lcPcZ_c2c1 = gcPcZ_c1c2/gcPcP_c1c2
+                        lcPcZ_c2c1 = gcPcZ_c1c2/gcPcP_c1c2
 
                     tf_ZP_21 = {'TF_Z1': lc1cZ, 'TF_21': lc1c2,
                                 'TF_P1': lc1cP, 'TF_P2-1': lc2cP_c1,
@@ -1553,11 +1948,17 @@ class TFNoise(object):
 
             elif key == 'ZP-H':
                 if value:
-                    lcHcP = np.conj(self.cHP)/self.cHH
-                    coh_HP = utils.coherence(self.cHP, self.cHH, self.cPP)
-                    gcPcP_cH = self.cPP*(1. - coh_HP)
-                    gcPcZ_cH = self.cZP - np.conj(lcHcP*self.cHZ)
-                    lcPcZ_cH = gcPcZ_cH/gcPcP_cH
+                    if utils._tf_zp_h is not None:
+                        lcHcP, lcPcZ_cH = utils._tf_zp_h(
+                            self.cHH, self.cPP, self.cHP,
+                            self.cHZ, self.cZP)
+                    else:
+                        lcHcP = np.conj(self.cHP)/self.cHH
+                        coh_HP = utils.coherence(
+                            self.cHP, self.cHH, self.cPP)
+                        gcPcP_cH = self.cPP*(1. - coh_HP)
+                        gcPcZ_cH = self.cZP - np.conj(lcHcP*self.cHZ)
+                        lcPcZ_cH = gcPcZ_cH/gcPcP_cH
                     tf_ZP_H = {'TF_PH': lcHcP, 'TF_ZP-H': lcPcZ_cH}
                     transfunc.add('ZP-H', tf_ZP_H)
 
@@ -1613,25 +2014,60 @@ class TFNoise(object):
             print("Warning: saving before having calculated the transfer " +
                   "functions")
 
-        # Remove traces to save disk space
-        del self.c11
-        del self.c22
-        del self.cZZ
-        del self.cPP
-        del self.cHH
-        del self.cHZ
-        del self.cHP
-        del self.c12
-        del self.c1Z
-        del self.c1P
-        del self.c2Z
-        del self.c2P
-        del self.cZP
+        # Don't write the unpacked spectra - strip them from a shallow
+        # copy so the in-memory object stays usable after saving
+        out = copy.copy(self)
+        for attr in ['c11', 'c22', 'cZZ', 'cPP', 'cHH', 'cHZ', 'cHP',
+                     'c12', 'c1Z', 'c1P', 'c2Z', 'c2P', 'cZP']:
+            out.__dict__.pop(attr, None)
+
         file = open(filename, 'wb')
-        pickle.dump(self, file)
+        pickle.dump(out, file, protocol=pickle.HIGHEST_PROTOCOL)
         file.close()
 
 
+def _corr_ZP(transfunc, ftZ, ft1, ft2, ftP, ftH, out):
+    np.subtract(ftZ, transfunc['ZP']['TF_ZP']*ftP, out=out)
+
+
+def _corr_Z1(transfunc, ftZ, ft1, ft2, ftP, ftH, out):
+    np.subtract(ftZ, transfunc['Z1']['TF_Z1']*ft1, out=out)
+
+
+def _corr_Z2_1(transfunc, ftZ, ft1, ft2, ftP, ftH, out):
+    tf = transfunc['Z2-1']
+    TF_Z1 = transfunc['Z1']['TF_Z1']
+    np.subtract(ftZ - TF_Z1*ft1,
+                (ft2 - ft1*tf['TF_21'])*tf['TF_Z2-1'], out=out)
+
+
+def _corr_ZP_21(transfunc, ftZ, ft1, ft2, ftP, ftH, out):
+    tf = transfunc['ZP-21']
+    ft2_1 = ft2 - ft1*tf['TF_21']
+    np.subtract(ftZ - tf['TF_Z1']*ft1 - ft2_1*tf['TF_Z2-1'],
+                (ftP - ft1*tf['TF_P1'] -
+                 ft2_1*tf['TF_P2-1'])*tf['TF_ZP-21'], out=out)
+
+
+def _corr_ZH(transfunc, ftZ, ft1, ft2, ftP, ftH, out):
+    np.subtract(ftZ, transfunc['ZH']['TF_ZH']*ftH, out=out)
+
+
+def _corr_ZP_H(transfunc, ftZ, ft1, ft2, ftP, ftH, out):
+    tf = transfunc['ZP-H']
+    TF_ZH = transfunc['ZH']['TF_ZH']
+    np.subtract(ftZ - TF_ZH*ftH,
+                (ftP - ftH*tf['TF_PH'])*tf['TF_ZP-H'], out=out)
+
+
+# Correction recipes in their canonical order. Module-level functions
+# rather than per-call closures, so the table is built once and each
+# recipe can be JIT-compiled independently if ever needed
+_CORRECTORS = (('ZP', _corr_ZP), ('Z1', _corr_Z1), ('Z2-1', _corr_Z2_1),
+               ('ZP-21', _corr_ZP_21), ('ZH', _corr_ZH),
+               ('ZP-H', _corr_ZP_H))
+
+
 class EventStream(object):
     """
     An EventStream object contains attributes that store station-event 
@@ -1864,114 +2300,61 @@ class EventStream(object):
             tr1 = self.sth.select(component='1')[0]
             tr2 = self.sth.select(component='2')[0]
 
-        # Get Fourier spectra
-        ft1 = None
-        ft2 = None
-        ftZ = None
-        ftP = None
-        ftZ, f = utils.calculate_windowed_fft(trZ, ws, hann=False)
+        # Get Fourier spectra - all available components are stacked
+        # and transformed in one batched rfft call (one plan, one pass)
+        # rather than up to four sequential transforms
+        comps = [trZ]
         if self.ncomp == 2 or self.ncomp == 4:
-            ftP, f = utils.calculate_windowed_fft(trP, ws, hann=False)
+            comps.append(trP)
         if self.ncomp == 3 or self.ncomp == 4:
-            ft1, f = utils.calculate_windowed_fft(tr1, ws, hann=False)
-            ft2, f = utils.calculate_windowed_fft(tr2, ws, hann=False)
-
-        if not np.allclose(f, tfnoise.f):
-            raise(Exception('Frequency axes are different: ', f, tfnoise.f))
-
-        for key, value in tf_list.items():
-
-            if key == 'ZP' and self.ev_list[key]:
-                if value and tf_list[key]:
-                    TF_ZP = transfunc[key]['TF_ZP']
-                    fTF_ZP = np.hstack(
-                        (TF_ZP, np.conj(TF_ZP[::-1][1:len(f)-1])))
-                    corrspec = ftZ - fTF_ZP*ftP
-                    corrtime = np.real(np.fft.ifft(corrspec))[0:ws]
-                    correct.add('ZP', corrtime)
-
-            if key == 'Z1' and self.ev_list[key]:
-                if value and tf_list[key]:
-                    TF_Z1 = transfunc[key]['TF_Z1']
-                    fTF_Z1 = np.hstack(
-                        (TF_Z1, np.conj(TF_Z1[::-1][1:len(f)-1])))
-                    corrspec = ftZ - fTF_Z1*ft1
-                    corrtime = np.real(np.fft.ifft(corrspec))[0:ws]
-                    correct.add('Z1', corrtime)
-
-            if key == 'Z2-1' and self.ev_list[key]:
-                if value and tf_list[key]:
-                    TF_Z1 = transfunc['Z1']['TF_Z1']
-                    fTF_Z1 = np.hstack(
-                        (TF_Z1, np.conj(TF_Z1[::-1][1:len(f)-1])))
-                    TF_21 = transfunc[key]['TF_21']
-                    fTF_21 = np.hstack(
-                        (TF_21, np.conj(TF_21[::-1][1:len(f)-1])))
-                    TF_Z2_1 = transfunc[key]['TF_Z2-1']
-                    fTF_Z2_1 = np.hstack(
-                        (TF_Z2_1, np.conj(TF_Z2_1[::-1][1:len(f)-1])))
-                    corrspec = ftZ - fTF_Z1*ft1 - (ft2 - ft1*fTF_21)*fTF_Z2_1
-                    corrtime = np.real(np.fft.ifft(corrspec))[0:ws]
-                    correct.add('Z2-1', corrtime)
-
-            if key == 'ZP-21' and self.ev_list[key]:
-                if value and tf_list[key]:
-                    TF_Z1 = transfunc[key]['TF_Z1']
-                    fTF_Z1 = np.hstack(
-                        (TF_Z1, np.conj(TF_Z1[::-1][1:len(f)-1])))
-                    TF_21 = transfunc[key]['TF_21']
-                    fTF_21 = np.hstack(
-                        (TF_21, np.conj(TF_21[::-1][1:len(f)-1])))
-                    TF_Z2_1 = transfunc[key]['TF_Z2-1']
-                    fTF_Z2_1 = np.hstack(
-                        (TF_Z2_1, np.conj(TF_Z2_1[::-1][1:len(f)-1])))
-                    TF_P1 = transfunc[key]['TF_P1']
-                    fTF_P1 = np.hstack(
-                        (TF_P1, np.conj(TF_P1[::-1][1:len(f)-1])))
-                    TF_P2_1 = transfunc[key]['TF_P2-1']
-                    fTF_P2_1 = np.hstack(
-                        (TF_P2_1, np.conj(TF_P2_1[::-1][1:len(f)-1])))
-                    TF_ZP_21 = transfunc[key]['TF_ZP-21']
-                    fTF_ZP_21 = np.hstack(
-                        (TF_ZP_21, np.conj(TF_ZP_21[::-1][1:len(f)-1])))
-                    corrspec = ftZ - fTF_Z1*ft1 - \
-                        (ft2 - ft1*fTF_21)*fTF_Z2_1 - \
-                        (ftP - ft1*fTF_P1 - \
-                        (ft2 - ft1*fTF_21)*fTF_P2_1)*fTF_ZP_21
-                    corrtime = np.real(np.fft.ifft(corrspec))[0:ws]
-                    correct.add('ZP-21', corrtime)
-
-            if key == 'ZH' and self.ev_list[key]:
-                if value and tf_list[key]:
-
-                    # Rotate horizontals
-                    ftH = utils.rotate_dir(ft1, ft2, tfnoise.tilt)
-
-                    TF_ZH = transfunc[key]['TF_ZH']
-                    fTF_ZH = np.hstack(
-                        (TF_ZH, np.conj(TF_ZH[::-1][1:len(f)-1])))
-                    corrspec = ftZ - fTF_ZH*ftH
-                    corrtime = np.real(np.fft.ifft(corrspec))[0:ws]
-                    correct.add('ZH', corrtime)
-
-            if key == 'ZP-H' and self.ev_list[key]:
-                if value and tf_list[key]:
-
-                    # Rotate horizontals
-                    ftH = utils.rotate_dir(ft1, ft2, tfnoise.tilt)
-
-                    TF_ZH = transfunc['ZH']['TF_ZH']
-                    fTF_ZH = np.hstack(
-                        (TF_ZH, np.conj(TF_ZH[::-1][1:len(f)-1])))
-                    TF_PH = transfunc[key]['TF_PH']
-                    fTF_PH = np.hstack(
-                        (TF_PH, np.conj(TF_PH[::-1][1:len(f)-1])))
-                    TF_ZP_H = transfunc[key]['TF_ZP-H']
-                    fTF_ZP_H = np.hstack(
-                        (TF_ZP_H, np.conj(TF_ZP_H[::-1][1:len(f)-1])))
-                    corrspec = ftZ - fTF_ZH*ftH - (ftP - ftH*fTF_PH)*fTF_ZP_H
-                    corrtime = np.real(np.fft.ifft(corrspec))[0:ws]
-                    correct.add('ZP-H', corrtime)
+            comps.extend([tr1, tr2])
+
+        n2 = utils.windowed_fft_len(ws)
+        f = self.fs/2. * np.linspace(0., 1., int(n2/2) + 1)
+
+        data = np.stack([tr.data for tr in comps]).astype(float)
+        data -= data.mean(axis=-1, keepdims=True)
+        fts = rfft(data, n=n2, axis=-1, workers=-1)
+
+        ft1 = ft2 = ftZ = ftP = None
+        ftZ = fts[0]
+        if self.ncomp == 2 or self.ncomp == 4:
+            ftP = fts[1]
+        if self.ncomp == 3 or self.ncomp == 4:
+            ft1 = fts[-2]
+            ft2 = fts[-1]
+
+        # The frequency-axis check touches both full arrays - do it
+        # once per TFNoise object and remember the outcome, since the
+        # same transfer functions are typically applied to many events
+        if getattr(self, '_f_checked', None) != id(tfnoise.f):
+            if not np.allclose(f, tfnoise.f):
+                raise(Exception(
+                    'Frequency axes are different: ', f, tfnoise.f))
+            self._f_checked = id(tfnoise.f)
+
+        # The transfer functions and the rfft output are both defined
+        # on the positive-frequency half only; the corrected spectra
+        # are inverted with irfft below
+        nfft = 2*(len(f) - 1)
+
+        # Corrected half-spectra share a single preallocated buffer -
+        # each recipe in _CORRECTORS writes its final subtraction into
+        # it
+
+        buf = np.empty(len(f), dtype=complex)
+
+        # Rotated horizontals are shared by the ZH and ZP-H recipes
+        ftH = None
+        if (tf_list['ZH'] and self.ev_list['ZH']) or \
+                (tf_list['ZP-H'] and self.ev_list['ZP-H']):
+            ftH = utils.rotate_dir(ft1, ft2, tfnoise.tilt)
+
+        # Dispatch over the module-level recipe table, in fixed order
+        for key, fn in _CORRECTORS:
+            if tf_list[key] and self.ev_list[key]:
+                fn(transfunc, ftZ, ft1, ft2, ftP, ftH, buf)
+                correct.add(key, irfft(buf, n=nfft, workers=-1)[0:ws])
 
         self.correct = correct
 
@@ -2006,5 +2389,61 @@ class EventStream(object):
                   "the corrections")
 
         file = open(filename, 'wb')
-        pickle.dump(self, file)
+        pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
         file.close()
+
+
+def _correct_event(args):
+    """
+    Applies the transfer-function corrections to a single
+    :class:`~obstools.atacr.classes.EventStream` object. Defined at
+    module level so that it can be pickled by :func:`process_events`
+    workers.
+
+    """
+
+    evstream, tfnoise = args
+    evstream.correct_data(tfnoise)
+
+    return evstream
+
+
+def process_events(eventlist, tfnoise, n_jobs=-1):
+    """
+    Corrects a list of :class:`~obstools.atacr.classes.EventStream`
+    objects with the same set of transfer functions in parallel across
+    worker processes. Events are independent of each other, so batch
+    correction scales nearly linearly with the available cores.
+
+    Parameters
+    ----------
+    eventlist : list
+        List of :class:`~obstools.atacr.classes.EventStream` objects to
+        correct
+    tfnoise : :class:`~obstools.atacr.classes.TFNoise`
+        Object that contains the noise transfer functions used in the
+        corrections
+    n_jobs : int
+        Number of worker processes. A negative value uses all available
+        cores; `n_jobs=1` corrects the events sequentially in the
+        current process.
+
+    Returns
+    -------
+    eventlist : list
+        List of corrected :class:`~obstools.atacr.classes.EventStream`
+        objects, in the same order as the input
+
+    """
+
+    if n_jobs == 1 or len(eventlist) < 2:
+        return [_correct_event((ev, tfnoise)) for ev in eventlist]
+
+    import multiprocessing as mp
+
+    if n_jobs < 0:
+        n_jobs = mp.cpu_count()
+
+    with mp.Pool(min(n_jobs, len(eventlist))) as pool:
+        return pool.map(_correct_event,
+                        [(ev, tfnoise) for ev in eventlist])
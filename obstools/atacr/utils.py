@@ -29,9 +29,147 @@ class methods of `~obstools.atacr.classes`.
 import os
 import numpy as np
 import fnmatch
-from matplotlib import pyplot as plt
 from obspy.core import read, Stream, Trace, AttribDict
 from scipy.signal import savgol_filter
+from scipy.ndimage import uniform_filter1d
+from scipy.fft import fft, next_fast_len
+
+# Optional numba acceleration for the boxcar smoother used on the
+# log-PSD matrices - fall back to plain numpy when not installed
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _box_smooth(data, nd):
+        """
+        Boxcar smoothing along the last axis from prefix sums,
+        parallelized over rows (each row is contiguous). Matches
+        np.convolve(x, np.ones(nd)/nd, 'same') with zero padding at
+        the edges.
+        """
+        nw, nf = data.shape
+        filt = np.zeros((nw, nf))
+        hw = (nd - 1)//2
+        for i in prange(nw):
+            cs = np.zeros(nf + 1)
+            for j in range(nf):
+                cs[j + 1] = cs[j] + data[i, j]
+            for j in range(nf):
+                hi = j + hw + 1
+                lo = hi - nd
+                if hi > nf:
+                    hi = nf
+                if lo < 0:
+                    lo = 0
+                filt[i, j] = (cs[hi] - cs[lo])/nd
+        return filt
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _log_box_smooth(data, nd):
+        """
+        Boxcar smoothing of the natural log of `data` along the last
+        axis, with the logarithm folded into the prefix-sum pass so the
+        log-PSD matrix is never materialized separately.
+        """
+        nw, nf = data.shape
+        filt = np.zeros((nw, nf))
+        hw = (nd - 1)//2
+        for i in prange(nw):
+            cs = np.zeros(nf + 1)
+            for j in range(nf):
+                cs[j + 1] = cs[j] + np.log(data[i, j])
+            for j in range(nf):
+                hi = j + hw + 1
+                lo = hi - nd
+                if hi > nf:
+                    hi = nf
+                if lo < 0:
+                    lo = 0
+                filt[i, j] = (cs[hi] - cs[lo])/nd
+        return filt
+
+    @njit(fastmath=True, cache=True)
+    def _tf_z2_1(c11, c22, c12, c1Z, c2Z):
+        """
+        Fused kernel for the 'Z2-1' transfer-function algebra: one pass
+        per frequency with no intermediate arrays.
+        """
+        n = len(c11)
+        lc1c2 = np.empty(n, dtype=np.complex128)
+        lc2cZ_c1 = np.empty(n, dtype=np.complex128)
+        for i in range(n):
+            l12 = np.conj(c12[i])/c11[i]
+            coh_12 = abs(c12[i])**2/(c11[i]*c22[i])
+            gc2c2_c1 = c22[i]*(1. - coh_12)
+            gc2cZ_c1 = np.conj(c2Z[i]) - np.conj(l12*c1Z[i])
+            lc1c2[i] = l12
+            lc2cZ_c1[i] = gc2cZ_c1/gc2c2_c1
+        return lc1c2, lc2cZ_c1
+
+    @njit(fastmath=True, cache=True)
+    def _tf_zp_21(c11, c22, cPP, c12, c1Z, c1P, c2Z, c2P, cZP):
+        """
+        Fused kernel for the 'ZP-21' transfer-function algebra,
+        eliminating the dozen complex temporaries of the array form.
+        """
+        n = len(c11)
+        lc1cZ = np.empty(n, dtype=np.complex128)
+        lc1c2 = np.empty(n, dtype=np.complex128)
+        lc1cP = np.empty(n, dtype=np.complex128)
+        lc2cP_c1 = np.empty(n, dtype=np.complex128)
+        lc2cZ_c1 = np.empty(n, dtype=np.complex128)
+        lcPcZ_c2c1 = np.empty(n, dtype=np.complex128)
+        for i in range(n):
+            l1Z = np.conj(c1Z[i])/c11[i]
+            l12 = np.conj(c12[i])/c11[i]
+            l1P = np.conj(c1P[i])/c11[i]
+            coh_12 = abs(c12[i])**2/(c11[i]*c22[i])
+            coh_1P = abs(c1P[i])**2/(c11[i]*cPP[i])
+            gc2c2_c1 = c22[i]*(1. - coh_12)
+            gcPcP_c1 = cPP[i]*(1. - coh_1P)
+            gc2cZ_c1 = np.conj(c2Z[i]) - np.conj(l12*c1Z[i])
+            gcPcZ_c1 = cZP[i] - np.conj(l1P*c1Z[i])
+            gc2cP_c1 = np.conj(c2P[i]) - np.conj(l12*c1P[i])
+            l2P_1 = gc2cP_c1/gc2c2_c1
+            l2Z_1 = gc2cZ_c1/gc2c2_c1
+            coh_c2cP_c1 = abs(gc2cP_c1)**2/(gc2c2_c1*gcPcP_c1)
+            gcPcP_c1c2 = gcPcP_c1*(1. - coh_c2cP_c1)
+            gcPcZ_c1c2 = gcPcZ_c1 - np.conj(l2P_1)*gc2cZ_c1
+            lc1cZ[i] = l1Z
+            lc1c2[i] = l12
+            lc1cP[i] = l1P
+            lc2cP_c1[i] = l2P_1
+            lc2cZ_c1[i] = l2Z_1
+            lcPcZ_c2c1[i] = gcPcZ_c1c2/gcPcP_c1c2
+        return lc1cZ, lc1c2, lc1cP, lc2cP_c1, lc2cZ_c1, lcPcZ_c2c1
+
+    @njit(fastmath=True, cache=True)
+    def _tf_zp_h(cHH, cPP, cHP, cHZ, cZP):
+        """
+        Fused kernel for the 'ZP-H' transfer-function algebra.
+        """
+        n = len(cHH)
+        lcHcP = np.empty(n, dtype=np.complex128)
+        lcPcZ_cH = np.empty(n, dtype=np.complex128)
+        for i in range(n):
+            lHP = np.conj(cHP[i])/cHH[i]
+            coh_HP = abs(cHP[i])**2/(cHH[i]*cPP[i])
+            gcPcP_cH = cPP[i]*(1. - coh_HP)
+            gcPcZ_cH = cZP[i] - np.conj(lHP*cHZ[i])
+            lcHcP[i] = lHP
+            lcPcZ_cH[i] = gcPcZ_cH/gcPcP_cH
+        return lcHcP, lcPcZ_cH
+
+else:
+    _box_smooth = None
+    _log_box_smooth = None
+    _tf_z2_1 = None
+    _tf_zp_21 = None
+    _tf_zp_h = None
 
 
 def update_stats(tr, stla, stlo, stel, cha):
@@ -201,26 +339,35 @@ def get_event(eventpath, tstart, tend):
     return trN1, trN2, trNZ, trNP
 
 
-def calculate_tilt(ft1, ft2, ftZ, ftP, f, goodwins, tiltfreq=[0.005, 0.035]):
-    """ 
+def calculate_tilt(c11, c22, cZZ, c12, c1Z, c2Z, c1P, c2P, f,
+                   tiltfreq=[0.005, 0.035]):
+    """
     Determines tilt direction from maximum coherence between rotated H1 and Z.
+    Operates on the window-averaged auto and cross spectra of the raw
+    components - the rotated H is a linear combination of H1 and H2, so
+    every rotated spectrum is closed-form in the azimuth and the search
+    never needs the individual windowed FFTs.
 
     Parameters
     ----------
-    ft1, ft2, ftZ, ftP : :class:`~numpy.ndarray`
-        Fourier transform of corresponding H1, H2, HZ and HP components
+    c11, c22, cZZ : :class:`~numpy.ndarray`
+        Power spectral density functions of the H1, H2 and HZ components,
+        averaged over the good windows
+    c12, c1Z, c2Z : :class:`~numpy.ndarray`
+        Cross-spectral density functions between the corresponding
+        components, averaged over the good windows
+    c1P, c2P : :class:`~numpy.ndarray`
+        Cross-spectral density functions with the HP component, averaged
+        over the good windows. `None` if pressure data are not available.
     f : :class:`~numpy.ndarray`
         Frequency axis in Hz
-    goodwins : list 
-        List of booleans representing whether a window is good (True) or not (False). 
-        This attribute is returned from the method :func:`~obstools.atacr.classes.DayNoise.QC_daily_spectra`
-    tiltfreq : list 
+    tiltfreq : list
         Two floats representing the frequency band at which the tilt is calculated
 
     Returns
     -------
     cHH, cHZ, cHP : :class:`~numpy.ndarray`
-        Arrays of power and cross-spectral density functions of components HH (rotated H1 
+        Arrays of power and cross-spectral density functions of components HH (rotated H1
         in direction of maximum tilt), HZ, and HP
     coh : :class:`~numpy.ndarray`
         Coherence value between rotated H and Z components, as a function of directions (azimuths)
@@ -228,8 +375,8 @@ def calculate_tilt(ft1, ft2, ftZ, ftP, f, goodwins, tiltfreq=[0.005, 0.035]):
         Phase value between rotated H and Z components, as a function of directions (azimuths)
     direc : :class:`~numpy.ndarray`
         Array of directions (azimuths) considered
-    tilt : float 
-        Direction (azimuth) of maximum coherence between rotated H1 and Z 
+    tilt : float
+        Direction (azimuth) of maximum coherence between rotated H1 and Z
     coh_value : float
         Coherence value at tilt direction
     phase_value : float
@@ -238,67 +385,37 @@ def calculate_tilt(ft1, ft2, ftZ, ftP, f, goodwins, tiltfreq=[0.005, 0.035]):
     """
 
     direc = np.arange(0., 360., 10.)
-    coh = np.zeros(len(direc))
-    ph = np.zeros(len(direc))
-    cZZ = np.abs(np.mean(ftZ[goodwins, :] *
-                         np.conj(ftZ[goodwins, :]), axis=0))[0:len(f)]
 
-    for i, d in enumerate(direc):
+    # Band over which the coherence and phase are averaged
+    band = (f > tiltfreq[0]) & (f < tiltfreq[1])
 
-        # Rotate horizontals
-        ftH = rotate_dir(ft1, ft2, d)
+    def _coh_ph(angles):
+        # Coherence and phase between rotated H and Z for all candidate
+        # angles at once (azimuth convention as in rotate_dir)
+        d = -angles*np.pi/180. + np.pi/2.
+        ca = np.cos(d)[:, None]
+        sa = np.sin(d)[:, None]
+        cHH = np.abs(ca*ca*c11[band] + sa*sa*c22[band] +
+                     2.*ca*sa*np.real(c12[band]))
+        cHZ = ca*c1Z[band] + sa*c2Z[band]
+        Co = np.abs(cHZ)**2/(cHH*cZZ[band])
+        Ph = np.angle(cHZ)
+        return np.mean(Co, axis=1), np.pi/2. - np.mean(Ph, axis=1)
 
-        # Get transfer functions
-        cHH = np.abs(np.mean(ftH[goodwins, :] *
-                             np.conj(ftH[goodwins, :]), axis=0))[0:len(f)]
-        cHZ = np.mean(ftH[goodwins, :] *
-                      np.conj(ftZ[goodwins, :]), axis=0)[0:len(f)]
-
-        Co = coherence(cHZ, cHH, cZZ)
-        Ph = phase(cHZ)
-
-        # Calculate coherence over frequency band
-        coh[i] = np.mean(Co[(f > tiltfreq[0]) & (f < tiltfreq[1])])
-        ph[i] = np.pi/2. - np.mean(Ph[(f > tiltfreq[0]) & (f < tiltfreq[1])])
+    coh, ph = _coh_ph(direc)
 
     # Index where coherence is max
-    ind = np.argwhere(coh == coh.max())
-
-    # Phase and direction at maximum coherence
-    phase_value = ph[ind[0]][0]
-    coh_value = coh[ind[0]][0]
-    tilt = direc[ind[0]][0]
-
-    # Refine search
-    rdirec = np.arange(direc[ind[0]][0]-10., direc[ind[0]][0]+10., 1.)
-    rcoh = np.zeros(len(direc))
-    rph = np.zeros(len(direc))
+    ind = np.argmax(coh)
 
-    for i, d in enumerate(rdirec):
-
-        # Rotate horizontals
-        ftH = rotate_dir(ft1, ft2, d)
-
-        # Get transfer functions
-        cHH = np.abs(np.mean(ftH[goodwins, :] *
-                             np.conj(ftH[goodwins, :]), axis=0))[0:len(f)]
-        cHZ = np.mean(ftH[goodwins, :] *
-                      np.conj(ftZ[goodwins, :]), axis=0)[0:len(f)]
-
-        Co = coherence(cHZ, cHH, cZZ)
-        Ph = phase(cHZ)
-
-        # Calculate coherence over frequency band
-        rcoh[i] = np.mean(Co[(f > tiltfreq[0]) & (f < tiltfreq[1])])
-        rph[i] = np.pi/2. - np.mean(Ph[(f > tiltfreq[0]) & (f < tiltfreq[1])])
-
-    # Index where coherence is max
-    ind = np.argwhere(rcoh == rcoh.max())
+    # Refine search around the coarse maximum
+    rdirec = np.arange(direc[ind]-10., direc[ind]+10., 1.)
+    rcoh, rph = _coh_ph(rdirec)
 
     # Phase and direction at maximum coherence
-    phase_value = rph[ind[0]][0]
-    coh_value = rcoh[ind[0]][0]
-    tilt = rdirec[ind[0]][0]
+    ind = np.argmax(rcoh)
+    phase_value = rph[ind]
+    coh_value = rcoh[ind]
+    tilt = rdirec[ind]
 
     # Phase has to be close to zero - otherwise add pi
     if phase_value > 0.5*np.pi:
@@ -308,22 +425,47 @@ def calculate_tilt(ft1, ft2, ftZ, ftP, f, goodwins, tiltfreq=[0.005, 0.035]):
 
     # print('Maximum coherence for tilt = ', tilt)
 
-    # Now calculate spectra at tilt direction
-    ftH = rotate_dir(ft1, ft2, tilt)
-
-    # Get transfer functions
-    cHH = np.abs(np.mean(ftH[goodwins, :] *
-                         np.conj(ftH[goodwins, :]), axis=0))[0:len(f)]
-    cHZ = np.mean(ftH[goodwins, :]*np.conj(ftZ[goodwins, :]), axis=0)[0:len(f)]
-    if np.any(ftP):
-        cHP = np.mean(ftH[goodwins, :] *
-                      np.conj(ftP[goodwins, :]), axis=0)[0:len(f)]
+    # Now calculate spectra at tilt direction from the same closed form
+    d = -tilt*np.pi/180. + np.pi/2.
+    ca = np.cos(d)
+    sa = np.sin(d)
+    cHH = np.abs(ca*ca*c11 + sa*sa*c22 + 2.*ca*sa*np.real(c12))
+    cHZ = ca*c1Z + sa*c2Z
+    if c1P is not None:
+        cHP = ca*c1P + sa*c2P
     else:
         cHP = None
 
     return cHH, cHZ, cHP, coh, ph, direc, tilt, coh_value, phase_value
 
 
+def windowed_fft_len(ws):
+    """
+    Returns the padded FFT length used for windowed Fourier transforms.
+    Pads to the next 5-smooth length rather than the next power of two -
+    pocketfft handles those equally well and the padding is much
+    shorter. The length is kept even so that the conjugate mirror
+    construction used downstream lines up with the one-sided spectrum
+
+    Parameters
+    ----------
+    ws : int
+        Window size, in number of samples
+
+    Returns
+    -------
+    n2 : int
+        Padded FFT length
+
+    """
+
+    n2 = next_fast_len(ws)
+    while n2 % 2:
+        n2 = next_fast_len(n2 + 1)
+
+    return n2
+
+
 def calculate_windowed_fft(trace, ws, ss=None, hann=True):
     """
     Calculates windowed Fourier transform
@@ -348,14 +490,33 @@ def calculate_windowed_fft(trace, ws, ss=None, hann=True):
 
     """
 
-    n2 = _npow2(ws)
+    n2 = windowed_fft_len(ws)
     f = trace.stats.sampling_rate/2. * np.linspace(0., 1., int(n2/2) + 1)
 
-    # Extract sliding windows
-    tr, nd = sliding_window(trace.data, ws, ss)
+    if ss is None:
+        ss = ws
+
+    # Extract sliding windows as a strided view, materialized in a
+    # single copy
+    a = trace.data
+    nd = (len(a) - ss) // ss
+    if nd == 0:
+        # Trace is too short to slide: single window over the full
+        # trace, kept 1-D as callers expect
+        tr = np.array(a, dtype=float)
+    else:
+        tr = np.lib.stride_tricks.sliding_window_view(
+            a, ws)[::ss][0:nd].astype(float)
+
+    # Remove the window means in the same pass (detrend='constant'),
+    # then taper - the mean would otherwise leak into all bins of the
+    # zero-padded transform
+    tr -= tr.mean(axis=-1, keepdims=True)
+    if hann:
+        tr *= np.hanning(tr.shape[-1])
 
-    # Fourier transform
-    ft = np.fft.fft(tr, n=n2)
+    # Fourier transform (multi-threaded across windows)
+    ft = fft(tr, n=n2, workers=-1)
 
     return ft, f
 
@@ -384,22 +545,79 @@ def smooth(data, nd, axis=0):
 
     """
     if np.any(data):
-        if data.ndim > 1:
-            filt = np.zeros(data.shape)
-            for i in range(data.shape[::-1][axis]):
-                if axis == 0:
-                    filt[:, i] = np.convolve(
-                        data[:, i], np.ones((nd,))/nd, mode='same')
-                elif axis == 1:
-                    filt[i, :] = np.convolve(
-                        data[i, :], np.ones((nd,))/nd, mode='same')
-        else:
-            filt = np.convolve(data, np.ones((nd,))/nd, mode='same')
-        return filt
+        if data.ndim > 1 and _box_smooth is not None:
+            # The kernel smooths along the last (contiguous) axis
+            if axis == 1:
+                return _box_smooth(
+                    np.ascontiguousarray(data, dtype=np.float64), nd)
+            else:
+                return _box_smooth(
+                    np.ascontiguousarray(data.T, dtype=np.float64), nd).T
+        # C-level running sum, O(N) in the window width - equivalent to
+        # np.convolve(x, np.ones(nd)/nd, 'same') with zero padding
+        return uniform_filter1d(data, size=nd, axis=axis,
+                                mode='constant', cval=0.)
     else:
         return None
 
 
+def log_smooth(data, nd, axis=0):
+    """
+    Function to smooth the natural log of power spectral density
+    functions. Equivalent to ``smooth(np.log(data), nd, axis)``, but
+    when numba is available the logarithm is folded into the running-sum
+    smoother so the log-PSD matrix is never written out separately
+
+    Parameters
+    ----------
+    data : :class:`~numpy.ndarray`
+        Real-valued array to smooth (PSD)
+    nd : int
+        Number of samples over which to smooth
+    axis : int
+        axis over which to perform the smoothing
+
+    Returns
+    -------
+    filt : :class:`~numpy.ndarray`, optional
+        Smoothed log of the data
+
+    """
+
+    if np.ndim(data) > 1 and _log_box_smooth is not None:
+        if axis == 1:
+            return _log_box_smooth(
+                np.ascontiguousarray(data, dtype=np.float64), nd)
+        else:
+            return _log_box_smooth(
+                np.ascontiguousarray(data.T, dtype=np.float64), nd).T
+    return smooth(np.log(data), nd, axis=axis)
+
+
+def median_bias(n):
+    """
+    Calculates the bias of the median of `n` periodogram estimates
+    relative to their mean, for exponentially distributed periodograms
+    (same correction as used by `scipy.signal.welch` with median
+    averaging)
+
+    Parameters
+    ----------
+    n : int
+        Number of periodogram estimates
+
+    Returns
+    -------
+    bias : float
+        Bias factor by which the median must be divided
+
+    """
+
+    ii_2 = 2.*np.arange(1., (n - 1)//2 + 1)
+
+    return 1. + np.sum(1./(ii_2 + 1.) - 1./ii_2)
+
+
 def admittance(Gxy, Gxx):
     """
     Calculates admittance between two components
@@ -445,7 +663,11 @@ def coherence(Gxy, Gxx, Gyy):
     """
 
     if np.any(Gxy) and np.any(Gxx) and np.any(Gxx):
-        return np.abs(Gxy)**2/(Gxx*Gyy)
+        # |Gxy|**2 without the square root of np.abs. Arguments may be
+        # stacked along a leading axis to batch several coherences in
+        # one vectorized pass
+        Gxy = np.asarray(Gxy)
+        return (Gxy.real**2 + Gxy.imag**2)/np.real(Gxx*Gyy)
     else:
         return None
 
@@ -555,7 +777,3 @@ def ftest(res1, pars1, res2, pars2):
     P = 1. - (f_dist.cdf(Fobs, dof1, dof2) - f_dist.cdf(1./Fobs, dof1, dof2))
 
     return P
-
-
-def _npow2(x):
-    return 1 if x == 0 else 2**(x-1).bit_length()